@@ -1,15 +1,22 @@
-import json
+import asyncio
 import logging
+import queue
+import re
 import sqlite3
 import sys
+import threading
 import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, conint
+import msgspec
+import orjson
+from fastapi import FastAPI, Request, HTTPException, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 
 # -----------------------------
@@ -31,13 +38,35 @@ class SafeStreamHandler(logging.StreamHandler):
             return
 
 
+class JsonFormatter(logging.Formatter):
+    """Render each record as one structured JSON line.
+
+    Encoding happens here, in the handler, rather than at every call
+    site — log_event just attaches its fields to the record.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            # UTC with the zone baked in: one gmtime call, no tz conversion
+            # and no %z formatting per record.
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(record.created)),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            payload.update(fields)
+        return orjson.dumps(payload).decode()
+
+
 logger = logging.getLogger("ops_api")
 logger.setLevel(logging.INFO)
 logger.propagate = False
 
 _handler = SafeStreamHandler(sys.stdout)
 _handler.setLevel(logging.INFO)
-_handler.setFormatter(logging.Formatter("%(message)s"))
+_handler.setFormatter(JsonFormatter())
 
 # Avoid duplicate handlers in reload
 if not any(isinstance(h, SafeStreamHandler) for h in logger.handlers):
@@ -45,18 +74,11 @@ if not any(isinstance(h, SafeStreamHandler) for h in logger.handlers):
 
 
 def log_event(level: str, msg: str, **fields) -> None:
-    payload = {
-        "ts": datetime.now(timezone.utc).astimezone().strftime("%Y-%m-%dT%H:%M:%S%z"),
-        "level": level,
-        "logger": "ops_api",
-        "msg": msg,
-        **fields,
-    }
-    line = json.dumps(payload)
-    if level == "ERROR":
-        logger.error(line)
-    else:
-        logger.info(line)
+    logger.log(
+        logging.ERROR if level == "ERROR" else logging.INFO,
+        msg,
+        extra={"fields": fields},
+    )
 
 
 # -----------------------------
@@ -64,6 +86,60 @@ def log_event(level: str, msg: str, **fields) -> None:
 # -----------------------------
 DB_PATH = "app.db"
 
+# Applied once per pooled connection: the cache/mmap settings keep hot
+# pages in memory across requests.
+CONNECTION_PRAGMAS = """
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+PRAGMA mmap_size=268435456;
+PRAGMA busy_timeout=5000;
+"""
+
+# WAL lets readers proceed alongside the writer and synchronous=NORMAL
+# drops the per-commit fsync to a WAL checkpoint cost. Setting these
+# needs write access, so read-only connections skip them.
+WRITER_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+"""
+
+# Hot-path SQL as module constants. sqlite3 caches compiled statements
+# per connection keyed by statement text, so reusing the exact same
+# string skips the parse/plan step on every call after the first.
+SQL_RECENT = "SELECT * FROM transactions ORDER BY created_at DESC LIMIT ?"
+SQL_BY_USER = (
+    "SELECT * FROM transactions WHERE user_id = ? ORDER BY created_at DESC LIMIT ?"
+)
+SQL_BY_ORDER = "SELECT * FROM transactions WHERE order_id = ?"
+SQL_INSERT = (
+    "INSERT INTO transactions (order_id, user_id, amount_cents, status, created_at)"
+    " VALUES (?, ?, ?, ?, ?)"
+)
+# RETURNING (SQLite >= 3.35) folds the insert and the echo-back SELECT
+# into a single statement.
+SQL_INSERT_RETURNING = SQL_INSERT + " RETURNING *"
+SQL_UPDATE_STATUS = "UPDATE transactions SET status = ? WHERE order_id = ?"
+
+# /transactions/search has only 2^4 filter combinations; build every SQL
+# template once at import, keyed by a bitmask of which filters are set.
+# Bit order matches the order params are appended in tx_search.
+_SEARCH_FILTERS = ("status = ?", "user_id = ?", "amount_cents >= ?", "amount_cents <= ?")
+
+
+def _build_search_sql() -> dict:
+    templates = {}
+    for mask in range(1 << len(_SEARCH_FILTERS)):
+        where = [f for i, f in enumerate(_SEARCH_FILTERS) if mask & (1 << i)]
+        sql = "SELECT * FROM transactions"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        templates[mask] = sql
+    return templates
+
+
+_SEARCH_SQL = _build_search_sql()
+
 SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS transactions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -76,6 +152,13 @@ CREATE TABLE IF NOT EXISTS transactions (
 
 CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions(user_id);
 CREATE INDEX IF NOT EXISTS idx_transactions_status ON transactions(status);
+
+-- Composite indexes matching the WHERE ... ORDER BY created_at DESC LIMIT
+-- shape of the read endpoints, so SQLite walks the B-tree in output order
+-- and stops after LIMIT rows instead of sorting the matched set.
+CREATE INDEX IF NOT EXISTS idx_tx_user_created ON transactions(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_tx_status_created ON transactions(status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_tx_created ON transactions(created_at DESC);
 """
 
 SEED_SQL = """
@@ -86,44 +169,327 @@ INSERT INTO transactions (order_id, user_id, amount_cents, status, created_at) V
     ('ORD-1004', 'U-003', 9999, 'approved', '2025-12-14T10:15:00Z');
 """
 
+# Ceiling on every wait for a pooled connection. Plain reads and stream
+# fetches share one executor, and streams hold their connection between
+# chunks — a thread parked in queue.get() forever can starve the very
+# fetches that would release a connection. Timing out turns that
+# overload into 503s instead of a deadlock.
+POOL_ACQUIRE_TIMEOUT = 5.0
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections.
+
+    Connections are opened once and reused across requests, so the hot
+    path pays a queue pop instead of a file open + PRAGMA re-parse on
+    every call. Hand-out is LIFO so the most recently used (cache-warm)
+    connection is picked first.
+    """
+
+    def __init__(self, db_path: str, min_size: int = 2, max_size: int = 10, readonly: bool = False):
+        self._db_path = db_path
+        self._max_size = max_size
+        self._readonly = readonly
+        self._queue: queue.LifoQueue = queue.LifoQueue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._created = 0
+        for _ in range(min_size):
+            self._queue.put(self._new_conn())
+
+    def _new_conn(self) -> sqlite3.Connection:
+        if self._readonly:
+            conn = sqlite3.connect(
+                f"file:{self._db_path}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=128,
+            )
+        else:
+            conn = sqlite3.connect(
+                self._db_path,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=128,
+            )
+            conn.executescript(WRITER_PRAGMAS)
+        conn.executescript(CONNECTION_PRAGMAS)
+        with self._lock:
+            self._created += 1
+        return conn
+
+    def acquire(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            grow = self._created < self._max_size
+        if grow:
+            return self._new_conn()
+        # Pool exhausted: block until a connection is returned, or raise
+        # queue.Empty after `timeout` seconds so a caller holding scarce
+        # resources (executor threads, streams) can't wait forever.
+        return self._queue.get(timeout=timeout)
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        try:
+            self._queue.put_nowait(conn)
+        except queue.Full:
+            conn.close()
 
-def get_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+    @contextmanager
+    def connection(self, timeout: Optional[float] = POOL_ACQUIRE_TIMEOUT):
+        try:
+            conn = self.acquire(timeout=timeout)
+        except queue.Empty:
+            raise HTTPException(status_code=503, detail="Connection pool exhausted")
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+
+# Under WAL, SQLite supports many concurrent readers but a single
+# writer. Keep one read-write connection for the write endpoints and a
+# pool of read-only connections for everything else, so a long-running
+# read can never hold the slot a write needs.
+READ_POOL: Optional[ConnectionPool] = None
+WRITE_POOL: Optional[ConnectionPool] = None
+
+# created_at strings are cached at 1ms granularity so a burst of inserts
+# reuses one formatted timestamp instead of building a datetime per row.
+_TS_CACHE = [0, ""]  # [time_ns when last formatted, ISO-8601 string]
+_TS_LOCK = threading.Lock()
+
+
+def _utcnow_iso() -> str:
+    now_ns = time.time_ns()
+    with _TS_LOCK:
+        if now_ns - _TS_CACHE[0] >= 1_000_000:
+            _TS_CACHE[0] = now_ns
+            _TS_CACHE[1] = (
+                datetime.fromtimestamp(now_ns / 1e9, tz=timezone.utc)
+                .isoformat()
+                .replace("+00:00", "Z")
+            )
+        return _TS_CACHE[1]
+
+# Dedicated pool for blocking SQLite work. The read endpoints are async
+# and delegate only the execute/fetch step here, keeping the event loop
+# free; max_workers stays at/below the connection pool size so a burst of
+# requests queues on threads instead of stalling on pool.acquire().
+EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="sqlite")
+
+
+def _rows_to_dicts(cur: sqlite3.Cursor) -> list:
+    """Fan plain tuple rows out to dicts using the cursor's column names.
+
+    Pooled connections deliberately skip ``row_factory = sqlite3.Row``:
+    building dicts once from ``cur.description`` is cheaper than going
+    Row -> dict for every row on the response path.
+    """
+    cols = [d[0] for d in cur.description]
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+def _row_to_dict(cur: sqlite3.Cursor) -> Optional[dict]:
+    row = cur.fetchone()
+    if row is None:
+        return None
+    cols = [d[0] for d in cur.description]
+    return dict(zip(cols, row))
+
+
+def _query_json_sync(sql: str, params: tuple) -> bytes:
+    """Run a SELECT on a pooled read connection and return the encoded JSON body."""
+    with READ_POOL.connection() as conn:
+        cur = conn.execute(sql, params)
+        return orjson.dumps(_rows_to_dicts(cur))
+
+
+def _fetch_one_sync(sql: str, params: tuple) -> Optional[dict]:
+    with READ_POOL.connection() as conn:
+        return _row_to_dict(conn.execute(sql, params))
+
+
+# Above this many rows, tx_by_user/tx_search stream the JSON array
+# incrementally instead of buffering the whole result with fetchall.
+STREAM_LIMIT_THRESHOLD = 500
+_STREAM_CHUNK_ROWS = 200
+
+
+async def _acquire_read_conn() -> sqlite3.Connection:
+    """Acquire a read connection for streaming, off the event loop.
+
+    Runs on the executor because an exhausted pool blocks, and blocking
+    the loop would freeze the very requests that release connections. A
+    timeout maps to 503 before the streaming response commits its 200.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(EXECUTOR, READ_POOL.acquire, POOL_ACQUIRE_TIMEOUT)
+    except queue.Empty:
+        raise HTTPException(status_code=503, detail="Connection pool exhausted")
+
+
+async def _stream_query(conn: sqlite3.Connection, sql: str, params: tuple):
+    """Yield a JSON array row-by-row without buffering the full result set.
+
+    Rows are fetched in chunks on the SQLite executor and encoded as they
+    arrive, so peak memory stays flat regardless of LIMIT and DB I/O
+    overlaps with serialization. The caller acquires `conn`; this
+    generator owns releasing it once the stream finishes or aborts.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        cur = await loop.run_in_executor(EXECUTOR, conn.execute, sql, params)
+        cols = [d[0] for d in cur.description]
+        yield b"["
+        first = True
+        while True:
+            rows = await loop.run_in_executor(EXECUTOR, cur.fetchmany, _STREAM_CHUNK_ROWS)
+            if not rows:
+                break
+            for row in rows:
+                if first:
+                    first = False
+                else:
+                    yield b","
+                yield orjson.dumps(dict(zip(cols, row)))
+        yield b"]"
+    finally:
+        READ_POOL.release(conn)
+
+
+@contextmanager
+def _write_txn(conn: sqlite3.Connection):
+    """Explicit write transaction; pooled connections run in autocommit.
+
+    BEGIN IMMEDIATE takes the write lock up front so the transaction can't
+    fail on a mid-transaction lock upgrade. Reads skip this entirely —
+    autocommit reads are lock-free under WAL.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
 
 
 def init_db() -> None:
-    conn = get_conn()
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
     try:
         cur = conn.cursor()
         cur.executescript(SCHEMA_SQL)
         row = cur.execute("SELECT COUNT(*) AS c FROM transactions").fetchone()
         if row and int(row["c"]) == 0:
             cur.executescript(SEED_SQL)
+        cur.execute("ANALYZE")
         conn.commit()
     finally:
         conn.close()
 
 
+# -----------------------------
+# Result cache
+# -----------------------------
+# Short-TTL LRU cache for the read endpoints, keyed by path + query
+# params. The transactions table only changes through
+# tx_create/tx_update_status, which clear the whole cache on commit, so a
+# few seconds of staleness is the worst case. Keys embed caller-supplied
+# values (user_id, search params), so the cache is capped and evicts
+# least-recently-used entries rather than growing without bound.
+CACHE_TTL_SECONDS = 3.0
+CACHE_MAX_ENTRIES = 1024
+
+_QCACHE: OrderedDict = OrderedDict()  # key -> (monotonic timestamp, encoded JSON bytes)
+_QCACHE_LOCK = threading.Lock()
+_QCACHE_STATS = {"hits": 0, "misses": 0}
+
+
+def _cache_get(key: str) -> Optional[bytes]:
+    with _QCACHE_LOCK:
+        entry = _QCACHE.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[0] < CACHE_TTL_SECONDS:
+                _QCACHE.move_to_end(key)
+                _QCACHE_STATS["hits"] += 1
+                return entry[1]
+            del _QCACHE[key]
+        _QCACHE_STATS["misses"] += 1
+        return None
+
+
+def _cache_put(key: str, body: bytes) -> None:
+    with _QCACHE_LOCK:
+        _QCACHE[key] = (time.monotonic(), body)
+        _QCACHE.move_to_end(key)
+        while len(_QCACHE) > CACHE_MAX_ENTRIES:
+            _QCACHE.popitem(last=False)
+
+
+def _cache_clear() -> None:
+    with _QCACHE_LOCK:
+        _QCACHE.clear()
+
+
+def _json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
 # -----------------------------
 # App
 # -----------------------------
-app = FastAPI(title="FastAPI Incident Troubleshooting Lab")
+app = FastAPI(
+    title="FastAPI Incident Troubleshooting Lab",
+    default_response_class=ORJSONResponse,
+)
+
+# Pre-encoded error bodies so the error paths skip JSON encoding; the
+# 500 template only needs the request id spliced in.
+_ERR_500_PREFIX = b'{"detail":"Internal Server Error","request_id":"'
+_ERR_500_SUFFIX = b'"}'
+_NOT_FOUND_BODY = b'{"detail":"Not Found"}'
+_STATUS_NOT_FOUND_BODY = b'{"detail":"Not found"}'
+
+# Successful responses on these paths are not logged; load balancers hit
+# /health constantly and each line is a JSON encode + stdout write.
+# Errors on them are still logged in full.
+_SKIP_LOG = {"/health", "/"}
+
+# Inbound X-Request-Id values are client-controlled and get spliced into
+# the pre-encoded 500 body (and log lines) verbatim, so only adopt ids
+# that are plain uuid-ish hex — anything else gets a freshly minted one.
+_REQUEST_ID_RE = re.compile(r"^[0-9a-fA-F-]{8,36}$")
 
 
 @app.on_event("startup")
 def _startup() -> None:
+    global READ_POOL, WRITE_POOL
     init_db()
+    WRITE_POOL = ConnectionPool(DB_PATH, min_size=1, max_size=1)
+    READ_POOL = ConnectionPool(DB_PATH, min_size=2, max_size=8, readonly=True)
 
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    request_id = str(uuid.uuid4())
-    start = time.time()
+    # Reuse an upstream request id when it looks like one; uuid4().hex
+    # skips the dash-formatting of str(uuid4()) when we mint our own.
+    request_id = request.headers.get("x-request-id")
+    if not request_id or not _REQUEST_ID_RE.fullmatch(request_id):
+        request_id = uuid.uuid4().hex
+    client_ip = request.client.host if request.client else None
+    start = time.perf_counter_ns()
     try:
         response = await call_next(request)
-        duration_ms = int((time.time() - start) * 1000)
+        response.headers["X-Request-Id"] = request_id
+        if request.url.path in _SKIP_LOG and response.status_code < 400:
+            return response
+        duration_ms = (time.perf_counter_ns() - start) // 1_000_000
         log_event(
             "INFO",
             "request_completed",
@@ -132,12 +498,11 @@ async def log_requests(request: Request, call_next):
             path=request.url.path,
             status_code=response.status_code,
             duration_ms=duration_ms,
-            client_ip=(request.client.host if request.client else None),
+            client_ip=client_ip,
         )
-        response.headers["X-Request-Id"] = request_id
         return response
     except Exception as e:
-        duration_ms = int((time.time() - start) * 1000)
+        duration_ms = (time.perf_counter_ns() - start) // 1_000_000
         log_event(
             "ERROR",
             "unhandled_exception",
@@ -146,10 +511,14 @@ async def log_requests(request: Request, call_next):
             path=request.url.path,
             status_code=500,
             duration_ms=duration_ms,
-            client_ip=(request.client.host if request.client else None),
+            client_ip=client_ip,
             error_type=type(e).__name__,
         )
-        return JSONResponse(status_code=500, content={"detail": "Internal Server Error", "request_id": request_id})
+        return Response(
+            content=_ERR_500_PREFIX + request_id.encode() + _ERR_500_SUFFIX,
+            status_code=500,
+            media_type="application/json",
+        )
 
 
 # -----------------------------
@@ -160,6 +529,17 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/cache/stats")
+def cache_stats():
+    with _QCACHE_LOCK:
+        return {
+            "entries": len(_QCACHE),
+            "hits": _QCACHE_STATS["hits"],
+            "misses": _QCACHE_STATS["misses"],
+            "ttl_seconds": CACHE_TTL_SECONDS,
+        }
+
+
 @app.get("/fail")
 def fail():
     raise RuntimeError("simulated failure")
@@ -175,155 +555,198 @@ def timeout(seconds: int = 2):
 # Transactions endpoints
 # -----------------------------
 @app.get("/transactions/recent")
-def tx_recent(limit: int = 25):
-    conn = get_conn()
-    try:
-        rows = conn.execute(
-            "SELECT * FROM transactions ORDER BY created_at DESC LIMIT ?",
-            (limit,),
-        ).fetchall()
-        return [dict(r) for r in rows]
-    finally:
-        conn.close()
+async def tx_recent(limit: int = 25):
+    key = f"/transactions/recent|{limit}"
+    cached = _cache_get(key)
+    if cached is not None:
+        return _json_response(cached)
+
+    loop = asyncio.get_running_loop()
+    body = await loop.run_in_executor(EXECUTOR, _query_json_sync, SQL_RECENT, (limit,))
+    _cache_put(key, body)
+    return _json_response(body)
 
 
 
 @app.get("/transactions/by-order/{order_id}")
-def tx_by_order(order_id: str):
+async def tx_by_order(order_id: str):
     """Fetch a single transaction by its order_id (exact match)."""
     order_id = order_id.strip()
 
-    conn = get_conn()
-    try:
-        row = conn.execute(
-            "SELECT * FROM transactions WHERE order_id = ?",
-            (order_id,),
-        ).fetchone()
+    loop = asyncio.get_running_loop()
+    row = await loop.run_in_executor(EXECUTOR, _fetch_one_sync, SQL_BY_ORDER, (order_id,))
 
-        if not row:
-            raise HTTPException(status_code=404, detail="Not Found")
+    if not row:
+        return Response(content=_NOT_FOUND_BODY, status_code=404, media_type="application/json")
 
-        return dict(row)
-    finally:
-        conn.close()
+    return row
 
 @app.get("/transactions/bad-query")
 def tx_bad_query():
-    conn = get_conn()
-    try:
+    with READ_POOL.connection() as conn:
         conn.execute("SELECT * FROM not_a_real_table").fetchall()
         return {"ok": True}
-    finally:
-        conn.close()
 
 
-class TransactionCreate(BaseModel):
-    order_id: str = Field(min_length=3, max_length=50)
-    user_id: str = Field(min_length=2, max_length=50)
-    amount_cents: conint(ge=1, le=1_000_000)
+# Write payloads are decoded straight from the request body with msgspec,
+# which validates during parsing and skips Pydantic model construction.
+class TransactionCreate(msgspec.Struct):
+    order_id: str
+    user_id: str
+    amount_cents: int
     status: Literal["approved", "declined", "pending"] = "pending"
 
+    def __post_init__(self):
+        if not 3 <= len(self.order_id) <= 50:
+            raise ValueError("order_id must be 3-50 characters")
+        if not 2 <= len(self.user_id) <= 50:
+            raise ValueError("user_id must be 2-50 characters")
+        if not 1 <= self.amount_cents <= 1_000_000:
+            raise ValueError("amount_cents must be between 1 and 1000000")
+
 
-class TransactionUpdateStatus(BaseModel):
+class TransactionUpdateStatus(msgspec.Struct):
     status: Literal["approved", "declined", "pending"]
 
 
-@app.get("/transactions/by-user/{user_id}")
-def tx_by_user(user_id: str, limit: int = 25):
-    conn = get_conn()
+def _decode_body(body: bytes, payload_type):
     try:
-        rows = conn.execute(
-            """
-            SELECT * FROM transactions
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-            LIMIT ?
-            """,
-            (user_id, limit),
-        ).fetchall()
-        return [dict(r) for r in rows]
-    finally:
-        conn.close()
+        return msgspec.json.decode(body, type=payload_type)
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@app.get("/transactions/by-user/{user_id}")
+async def tx_by_user(user_id: str, limit: int = 25):
+    if limit > STREAM_LIMIT_THRESHOLD:
+        conn = await _acquire_read_conn()
+        return StreamingResponse(
+            _stream_query(conn, SQL_BY_USER, (user_id, limit)),
+            media_type="application/json",
+        )
+
+    key = f"/transactions/by-user|{user_id}|{limit}"
+    cached = _cache_get(key)
+    if cached is not None:
+        return _json_response(cached)
+
+    loop = asyncio.get_running_loop()
+    body = await loop.run_in_executor(EXECUTOR, _query_json_sync, SQL_BY_USER, (user_id, limit))
+    _cache_put(key, body)
+    return _json_response(body)
 
 
 @app.get("/transactions/search")
-def tx_search(
+async def tx_search(
     status: Optional[str] = None,
     min_amount_cents: Optional[int] = None,
     max_amount_cents: Optional[int] = None,
     user_id: Optional[str] = None,
     limit: int = 50,
 ):
-    where = []
+    mask = 0
     params = []
 
     if status:
-        where.append("status = ?")
+        mask |= 1
         params.append(status)
     if user_id:
-        where.append("user_id = ?")
+        mask |= 2
         params.append(user_id)
     if min_amount_cents is not None:
-        where.append("amount_cents >= ?")
+        mask |= 4
         params.append(min_amount_cents)
     if max_amount_cents is not None:
-        where.append("amount_cents <= ?")
+        mask |= 8
         params.append(max_amount_cents)
-
-    sql = "SELECT * FROM transactions"
-    if where:
-        sql += " WHERE " + " AND ".join(where)
-    sql += " ORDER BY created_at DESC LIMIT ?"
     params.append(limit)
 
-    conn = get_conn()
-    try:
-        rows = conn.execute(sql, tuple(params)).fetchall()
-        return [dict(r) for r in rows]
-    finally:
-        conn.close()
-
+    sql = _SEARCH_SQL[mask]
 
-@app.post("/transactions", status_code=201)
-def tx_create(payload: TransactionCreate):
-    conn = get_conn()
-    try:
-        created_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        conn.execute(
-            """
-            INSERT INTO transactions (order_id, user_id, amount_cents, status, created_at)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (payload.order_id, payload.user_id, payload.amount_cents, payload.status, created_at),
+    if limit > STREAM_LIMIT_THRESHOLD:
+        conn = await _acquire_read_conn()
+        return StreamingResponse(
+            _stream_query(conn, sql, tuple(params)),
+            media_type="application/json",
         )
-        conn.commit()
 
-        row = conn.execute(
-            "SELECT * FROM transactions WHERE order_id = ?",
-            (payload.order_id,),
-        ).fetchone()
-        return dict(row)
-    finally:
-        conn.close()
+    key = f"/transactions/search|{status}|{user_id}|{min_amount_cents}|{max_amount_cents}|{limit}"
+    cached = _cache_get(key)
+    if cached is not None:
+        return _json_response(cached)
+
+    loop = asyncio.get_running_loop()
+    body = await loop.run_in_executor(EXECUTOR, _query_json_sync, sql, tuple(params))
+    _cache_put(key, body)
+    return _json_response(body)
+
+
+@app.post("/transactions", status_code=201)
+async def tx_create(request: Request):
+    payload = _decode_body(await request.body(), TransactionCreate)
+    loop = asyncio.get_running_loop()
+    row = await loop.run_in_executor(EXECUTOR, _tx_create_sync, payload)
+    return row
+
+
+def _tx_create_sync(payload: TransactionCreate) -> dict:
+    with WRITE_POOL.connection() as conn:
+        created_at = _utcnow_iso()
+        with _write_txn(conn):
+            row = _row_to_dict(
+                conn.execute(
+                    SQL_INSERT_RETURNING,
+                    (payload.order_id, payload.user_id, payload.amount_cents, payload.status, created_at),
+                )
+            )
+    _cache_clear()
+    return row
+
+
+@app.post("/transactions/bulk", status_code=201)
+async def tx_bulk_create(request: Request):
+    payloads = _decode_body(await request.body(), List[TransactionCreate])
+    loop = asyncio.get_running_loop()
+    inserted = await loop.run_in_executor(EXECUTOR, _tx_bulk_create_sync, payloads)
+    return {"inserted": inserted}
+
+
+def _tx_bulk_create_sync(payloads: List[TransactionCreate]) -> int:
+    # One timestamp for the whole batch.
+    created_at = _utcnow_iso()
+    rows = [
+        (p.order_id, p.user_id, p.amount_cents, p.status, created_at)
+        for p in payloads
+    ]
+
+    with WRITE_POOL.connection() as conn:
+        # One transaction around the whole batch so the commit cost
+        # amortizes across N rows instead of being paid per insert.
+        with _write_txn(conn):
+            conn.executemany(SQL_INSERT, rows)
+    _cache_clear()
+    return len(rows)
 
 
 @app.put("/transactions/{order_id}/status")
-def tx_update_status(order_id: str, payload: TransactionUpdateStatus):
-    conn = get_conn()
-    try:
-        cur = conn.execute(
-            "UPDATE transactions SET status = ? WHERE order_id = ?",
-            (payload.status, order_id),
-        )
-        conn.commit()
+async def tx_update_status(order_id: str, request: Request):
+    payload = _decode_body(await request.body(), TransactionUpdateStatus)
+    loop = asyncio.get_running_loop()
+    row = await loop.run_in_executor(EXECUTOR, _tx_update_status_sync, order_id, payload)
+
+    if row is None:
+        return Response(content=_STATUS_NOT_FOUND_BODY, status_code=404, media_type="application/json")
+
+    return row
+
+
+def _tx_update_status_sync(order_id: str, payload: TransactionUpdateStatus) -> Optional[dict]:
+    with WRITE_POOL.connection() as conn:
+        with _write_txn(conn):
+            cur = conn.execute(SQL_UPDATE_STATUS, (payload.status, order_id))
+        _cache_clear()
 
         if cur.rowcount == 0:
-            return JSONResponse(status_code=404, content={"detail": "Not found"})
+            return None
 
-        row = conn.execute(
-            "SELECT * FROM transactions WHERE order_id = ?",
-            (order_id,),
-        ).fetchone()
-        return dict(row)
-    finally:
-        conn.close()
+        return _row_to_dict(conn.execute(SQL_BY_ORDER, (order_id,)))